@@ -0,0 +1,300 @@
+import logging
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Set
+
+from google_calendar_api import GoogleCalendarClient
+
+
+class NotificationCoalescer:
+    """
+    Collapses bursts of notifications for the same key into a single
+    callback, fired once no more than `delay` seconds after the first one.
+
+    Callbacks for a key never run concurrently. Notifications received
+    while the callback runs cause it to fire once more after it returns.
+    """
+
+    def __init__(self, callback: Callable[[str], None], delay: float = 5):
+        self.callback = callback
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._pending: Dict[str, threading.Timer] = {}
+        self._running: Set[str] = set()
+        self._rearm: Set[str] = set()
+
+    def notify(self, key: str) -> None:
+        with self._lock:
+            if key in self._pending:
+                return
+            if key in self._running:
+                self._rearm.add(key)
+                return
+            self._schedule(key)
+
+    def _schedule(self, key: str) -> None:
+        timer = threading.Timer(self.delay, self._fire, args=(key,))
+        timer.daemon = True
+        self._pending[key] = timer
+        timer.start()
+
+    def _fire(self, key: str) -> None:
+        with self._lock:
+            if self._pending.pop(key, None) is None:
+                return  # Cancelled
+            self._running.add(key)
+        try:
+            self.callback(key)
+        finally:
+            with self._lock:
+                self._running.discard(key)
+                if key in self._rearm:
+                    self._rearm.discard(key)
+                    self._schedule(key)
+
+    def cancel(self) -> None:
+        with self._lock:
+            for timer in self._pending.values():
+                timer.cancel()
+            self._pending.clear()
+            self._rearm.clear()
+
+
+class WebhookReceiver:
+    """
+    Small HTTP server receiving Google Calendar push notifications.
+
+    `resolve` maps a channel ID and token to the watched calendar ID, or
+    None if the notification is not for a known channel.
+    """
+
+    def __init__(
+        self,
+        resolve: Callable[[str, str], Optional[str]],
+        on_notification: Callable[[str], None],
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        logger=None,
+    ):
+        self.resolve = resolve
+        self.on_notification = on_notification
+        self.logger = logger or logging.getLogger(__name__)
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread: threading.Thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def _make_handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                calendar_id = receiver.resolve(
+                    self.headers.get("X-Goog-Channel-ID", ""),
+                    self.headers.get("X-Goog-Channel-Token", ""),
+                )
+                if not calendar_id:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                # The "sync" message only confirms that the channel exists.
+                if self.headers.get("X-Goog-Resource-State") != "sync":
+                    receiver.on_notification(calendar_id)
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                receiver.logger.debug(format % args)
+
+        return Handler
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        # shutdown() waits for serve_forever, so it would block if the
+        # receiver never started.
+        if self._thread:
+            self.server.shutdown()
+            self._thread = None
+        self.server.server_close()
+
+
+def _to_utc(date: datetime) -> datetime:
+    """Converts a date to naive UTC, with naive dates taken as UTC."""
+    if date.tzinfo is None:
+        return date
+    return date.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class CalendarWatcher:
+    """
+    Keeps notification channels open for a set of calendars and calls
+    `on_change` with the calendar ID whenever its events within the
+    published date range have changed.
+    """
+
+    def __init__(
+        self,
+        clients: List[GoogleCalendarClient],
+        address: str,
+        on_change: Callable[[str], None],
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        range_type: str = "month",
+        coalesce_delay: float = 5,
+        renew_before: float = 3600,
+        clock: Callable[[], float] = time.time,
+        logger=None,
+    ):
+        self.clients = {client.calendar_id: client for client in clients}
+        self.address = address
+        self.on_change = on_change
+        self.range_type = range_type
+        self.renew_before = renew_before
+        self.clock = clock
+        self.logger = logger or logging.getLogger(__name__)
+        self.token = secrets.token_urlsafe(32)
+        self.channels: Dict[str, dict] = {}
+        # Channel ID to calendar ID, read by the receiver threads.
+        self._channel_calendars: Dict[str, str] = {}
+        self._channels_lock = threading.Lock()
+        # IDs of the events of each calendar within the date range, so that
+        # events moved out of the range or deleted are noticed too, and the
+        # range they were collected for.
+        self._events_in_range: Dict[str, Set[str]] = {}
+        self._synced_ranges: Dict[str, tuple] = {}
+
+        self.coalescer = NotificationCoalescer(
+            self._handle_change, delay=coalesce_delay
+        )
+        self.receiver = WebhookReceiver(
+            self._resolve,
+            self.coalescer.notify,
+            host=host,
+            port=port,
+            logger=self.logger,
+        )
+
+    def _resolve(self, channel_id: str, token: str) -> Optional[str]:
+        if not secrets.compare_digest(token, self.token):
+            return None
+        with self._channels_lock:
+            return self._channel_calendars.get(channel_id)
+
+    @staticmethod
+    def _in_range(item: dict, date_range: tuple) -> bool:
+        if item.get("status") == "cancelled" or "start" not in item:
+            return False
+        start, end = (
+            GoogleCalendarClient.get_date({"dateTime": date})
+            for date in date_range
+        )
+        return (
+            _to_utc(GoogleCalendarClient.get_date(item["start"])) <= end
+            and _to_utc(GoogleCalendarClient.get_date(item["end"])) > start
+        )
+
+    def _sync(self, calendar_id: str) -> List[dict]:
+        """
+        Fetches the changed events of a calendar and returns those that
+        affect the published range.
+        """
+        client = self.clients[calendar_id]
+        date_range = GoogleCalendarClient.determine_date_range(self.range_type)
+        if self._synced_ranges.get(calendar_id) != date_range:
+            # The range has moved, or this is the first sync. Start over
+            # with a full sync of the new range, so that the events now
+            # inside it are known.
+            client.sync_token = None
+            self._events_in_range[calendar_id] = set()
+            self._synced_ranges[calendar_id] = date_range
+
+        known = self._events_in_range[calendar_id]
+        changes = []
+        for item in client.get_changed_events(self.range_type):
+            in_range = self._in_range(item, date_range)
+            if in_range or item["id"] in known:
+                changes.append(item)
+            if in_range:
+                known.add(item["id"])
+            else:
+                known.discard(item["id"])
+        return changes
+
+    def _handle_change(self, calendar_id: str) -> None:
+        try:
+            changes = self._sync(calendar_id)
+            if not changes:
+                return
+            self.logger.info(
+                f"{len(changes)} change(s) in calendar {calendar_id}"
+            )
+            self.on_change(calendar_id)
+        except Exception as e:
+            self.logger.error(f"Error handling change in {calendar_id}: {e}")
+
+    def renew(self) -> None:
+        """Opens channels that are missing or about to expire."""
+        for calendar_id, client in self.clients.items():
+            channel = self.channels.get(calendar_id)
+            # Expiration is a Unix timestamp in milliseconds.
+            if (
+                channel
+                and int(channel["expiration"]) / 1000 - self.clock()
+                > self.renew_before
+            ):
+                continue
+            try:
+                new_channel = client.watch_events(
+                    self.address, token=self.token
+                )
+            except Exception as e:
+                self.logger.error(f"Error watching {calendar_id}: {e}")
+                continue
+            self.channels[calendar_id] = new_channel
+            with self._channels_lock:
+                self._channel_calendars[new_channel["id"]] = calendar_id
+            if channel:
+                self._stop_channel(client, channel)
+
+    def _stop_channel(self, client: GoogleCalendarClient, channel: dict):
+        with self._channels_lock:
+            self._channel_calendars.pop(channel["id"], None)
+        try:
+            client.stop_watch(channel)
+        except Exception as e:
+            self.logger.warning(f"Error stopping channel {channel['id']}: {e}")
+
+    def start(self) -> None:
+        """Runs the initial sync, then starts receiving notifications."""
+        for calendar_id in self.clients:
+            self._sync(calendar_id)
+        self.receiver.start()
+        self.renew()
+
+    def stop(self) -> None:
+        for calendar_id, channel in self.channels.items():
+            self._stop_channel(self.clients[calendar_id], channel)
+        self.channels.clear()
+        self.receiver.stop()
+        self.coalescer.cancel()
+
+    def run(self, check_interval: float = 300) -> None:
+        """Serves notifications and renews channels until interrupted."""
+        self.start()
+        try:
+            while True:
+                time.sleep(check_interval)
+                self.renew()
+        finally:
+            self.stop()
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
@@ -18,6 +19,9 @@ class Event:
     end_time: str = field(default=None)
     tickets: Optional[str] = None
     website: Optional[str] = None
+    # Raw fields used to order and deduplicate events across calendars.
+    start: Optional[datetime] = field(default=None, compare=False, repr=False)
+    ical_uid: Optional[str] = field(default=None, compare=False, repr=False)
 
     TEMPLATE_PATH = (
         Path(__file__).parent / "templates/monthly_events_template.txt"
@@ -0,0 +1,69 @@
+import heapq
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Set
+
+from event import Event
+
+
+def _sort_key(event: Event) -> datetime:
+    """Start of the event, with naive times taken as UTC."""
+    if event.start is None:
+        raise ValueError(f"Event {event.title} has no start to sort by.")
+    if event.start.tzinfo is None:
+        return event.start.replace(tzinfo=timezone.utc)
+    return event.start
+
+
+def _dedup_keys(event: Event, start: datetime) -> Set[tuple]:
+    """Keys identifying the same event instance across calendars."""
+    keys = {
+        (
+            "content",
+            start,
+            event.title,
+            event.location,
+            event.description,
+            event.end_time,
+            event.tickets,
+            event.website,
+        )
+    }
+    if event.ical_uid:
+        # Recurring events share an iCalUID, so the start is part of the key.
+        keys.add(("ical_uid", start, event.ical_uid))
+    return keys
+
+
+def merge_events(streams: Iterable[Iterable[Event]]) -> Iterator[Event]:
+    """
+    Lazily merges event streams that are each ordered by start time into a
+    single ordered stream, dropping events already seen on another stream.
+    Runs in O(n log k) for n events over k streams.
+    """
+    iterators = [iter(stream) for stream in streams]
+    heap = []
+    for index, iterator in enumerate(iterators):
+        event = next(iterator, None)
+        if event is not None:
+            heap.append((_sort_key(event), index, event))
+    heapq.heapify(heap)
+
+    # Duplicates share the same start, so only the keys of events starting
+    # at the current time need to be kept.
+    current_start = None
+    seen: Set[tuple] = set()
+    while heap:
+        start, index, event = heap[0]
+        if start != current_start:
+            current_start = start
+            seen.clear()
+        keys = _dedup_keys(event, start)
+        if seen.isdisjoint(keys):
+            seen.update(keys)
+            yield event
+
+        following = next(iterators[index], None)
+        if following is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (_sort_key(following), index, following))
@@ -1,14 +1,18 @@
 import json
 import logging
 import os
+import uuid
 from datetime import datetime, timedelta
-from typing import List
+from typing import Iterator, List
+from zoneinfo import ZoneInfo
 
 from dateutil.relativedelta import relativedelta
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import Resource, build
+from googleapiclient.errors import HttpError
 
 from event import Event
+from event_merge import merge_events
 
 
 class GoogleCalendarClient:
@@ -42,7 +46,7 @@ class GoogleCalendarClient:
                     " variable."
                 )
 
-        self.calendar_id = calendar_id
+        self.calendar_ids: List[str] = self.split_calendar_ids(calendar_id)
 
         self.credentials: Credentials = Credentials.from_service_account_info(
             json.loads(credentials)
@@ -55,6 +59,22 @@ class GoogleCalendarClient:
         )
 
         self.logger = logger or logging.getLogger(__name__)
+        self.sync_token: str = None
+
+    @property
+    def calendar_id(self) -> str:
+        """The calendar of a client reading a single calendar."""
+        if len(self.calendar_ids) != 1:
+            raise ValueError(
+                "A single calendar ID is required, got"
+                f" {len(self.calendar_ids)}."
+            )
+        return self.calendar_ids[0]
+
+    @staticmethod
+    def split_calendar_ids(calendar_id: str) -> List[str]:
+        """Splits a comma-separated list of calendar IDs."""
+        return [c.strip() for c in calendar_id.split(",") if c.strip()]
 
     @staticmethod
     def determine_date_range(range_type: str = "month") -> tuple():
@@ -88,51 +108,161 @@ class GoogleCalendarClient:
             ).replace(hour=23, minute=59, second=59, microsecond=999999)
         return (start_date.isoformat() + "Z", end_date.isoformat() + "Z")
 
-    def get_events(self, range_type: str = "month") -> List[Event]:
+    def get_events(
+        self, range_type: str = "month", raise_errors: bool = False
+    ) -> List[Event]:
         """
         Returns the events for the specified date range in 'Event' format.
         :param range_type: 'month' or 'week' to specify the desired date range.
+        :param raise_errors: Raise fetch errors instead of returning no events.
         """
-        date_range = self.determine_date_range(range_type)
         try:
-            events_result = (
-                self.service.events()
-                .list(
-                    calendarId=self.calendar_id,
-                    timeMin=date_range[0],
-                    timeMax=date_range[1],
-                    singleEvents=True,
-                    orderBy="startTime",
-                )
-                .execute()
-            )
+            return list(self.iter_merged_events(range_type))
+        except Exception as e:
+            if raise_errors:
+                raise
+            self.logger.error(f"Error fetching events: {e}")
+            return []
+
+    def iter_events(
+        self, range_type: str = "month", calendar_id: str = None
+    ) -> Iterator[Event]:
+        """
+        Lazily yields the events of a calendar ordered by start time,
+        fetching one page at a time.
+        :param range_type: 'month' or 'week' to specify the desired date range.
+        :param calendar_id: Calendar to read, defaults to the client calendar.
+        """
+        date_range = self.determine_date_range(range_type)
+        page_token = None
+        while True:
+            params = {
+                "calendarId": calendar_id or self.calendar_id,
+                "timeMin": date_range[0],
+                "timeMax": date_range[1],
+                "singleEvents": True,
+                "orderBy": "startTime",
+            }
+            if page_token:
+                params["pageToken"] = page_token
+            events_result = self.service.events().list(**params).execute()
             self.logger.info(
                 f"All Events: \n{json.dumps(events_result, indent=2)}"
             )
 
-            events_list: List[Event] = [
-                Event(
-                    title=event.get("summary", ""),
-                    location=event.get("location", ""),
-                    description=event.get("description", ""),
-                    start_time=self.get_date(event["start"])
-                    .strftime("%I%p")
-                    .lstrip("0"),
-                    date=(
-                        f"{self.get_date(event['start']).strftime('%b')} "
-                        f"{self.ordinal(self.get_date(event['start']).day)}"
-                    ),
-                    end_time=self.get_date(event["end"])
-                    .strftime("%I%p")
-                    .lstrip("0"),
-                )
-                for event in events_result.get("items", [])
-            ]
+            for event in events_result.get("items", []):
+                yield self.to_event(event, events_result.get("timeZone"))
 
-            return events_list
-        except Exception as e:
-            self.logger.error(f"Error fetching events: {e}")
-            return []
+            page_token = events_result.get("nextPageToken")
+            if not page_token:
+                return
+
+    def iter_merged_events(self, range_type: str = "month") -> Iterator[Event]:
+        """
+        Lazily yields the events of the client calendars as a single stream
+        ordered by start time, without events shared between calendars
+        being repeated.
+        :param range_type: 'month' or 'week' to specify the desired date range.
+        """
+        if len(self.calendar_ids) == 1:
+            return self.iter_events(range_type)
+        return merge_events(
+            self.iter_events(range_type, calendar_id=calendar_id)
+            for calendar_id in self.calendar_ids
+        )
+
+    def to_event(self, event: dict, time_zone: str = None) -> Event:
+        """
+        Converts a Google Calendar event resource to an 'Event'.
+        :param time_zone: Time zone of the calendar, in which all-day events
+        start.
+        """
+        start = self.get_date(event["start"])
+        if "dateTime" not in event["start"] and time_zone:
+            # Order all-day events the way Google does, at midnight in the
+            # calendar time zone rather than in UTC.
+            sort_start = start.replace(tzinfo=ZoneInfo(time_zone))
+        else:
+            sort_start = start
+        return Event(
+            title=event.get("summary", ""),
+            location=event.get("location", ""),
+            description=event.get("description", ""),
+            start_time=start.strftime("%I%p").lstrip("0"),
+            date=f"{start.strftime('%b')} {self.ordinal(start.day)}",
+            end_time=self.get_date(event["end"]).strftime("%I%p").lstrip("0"),
+            start=sort_start,
+            ical_uid=event.get("iCalUID"),
+        )
+
+    def get_changed_events(self, range_type: str = None) -> List[dict]:
+        """
+        Returns the raw events changed since the previous call.
+        The first call performs a full sync and returns every event.
+        :param range_type: 'month' or 'week' to limit the full sync to the
+        desired date range. Later changes are returned for any date.
+        """
+        items = []
+        page_token = None
+        while True:
+            # Apart from the sync token and the date range, every parameter
+            # must match the full sync.
+            params = {"calendarId": self.calendar_id, "singleEvents": True}
+            if page_token:
+                params["pageToken"] = page_token
+            if self.sync_token:
+                params["syncToken"] = self.sync_token
+            elif range_type:
+                # Google rejects a date range combined with a sync token.
+                date_range = self.determine_date_range(range_type)
+                params["timeMin"] = date_range[0]
+                params["timeMax"] = date_range[1]
+            try:
+                events_result = self.service.events().list(**params).execute()
+            except HttpError as e:
+                if e.resp.status != 410 or not self.sync_token:
+                    raise
+                # The sync token has expired, start over with a full sync.
+                self.logger.warning("Sync token expired, running full sync.")
+                self.sync_token = None
+                items = []
+                page_token = None
+                continue
+
+            items.extend(events_result.get("items", []))
+            page_token = events_result.get("nextPageToken")
+            if not page_token:
+                self.sync_token = events_result.get("nextSyncToken")
+                return items
+
+    def watch_events(self, address: str, token: str = None) -> dict:
+        """
+        Registers a notification channel for changes to the calendar.
+        :param address: HTTPS URL that receives the notifications.
+        :param token: Optional token sent back with every notification.
+        """
+        body = {
+            "id": str(uuid.uuid4()),
+            "type": "web_hook",
+            "address": address,
+        }
+        if token:
+            body["token"] = token
+        channel = (
+            self.service.events()
+            .watch(calendarId=self.calendar_id, body=body)
+            .execute()
+        )
+        self.logger.info(
+            f"Watching calendar {self.calendar_id} on channel {channel['id']}"
+        )
+        return channel
+
+    def stop_watch(self, channel: dict) -> None:
+        """Stops a notification channel created by watch_events."""
+        self.service.channels().stop(
+            body={"id": channel["id"], "resourceId": channel["resourceId"]}
+        ).execute()
 
     @staticmethod
     def get_date(data):
@@ -155,13 +285,16 @@ def get_events(
     calendar_id: str = None,
     logger=None,
     range_type: str = "month",
+    raise_errors: bool = False,
 ) -> List[Event]:
     """
     Convenience function to fetch events for the current month.
+    Several calendars can be given as a comma-separated calendar_id, their
+    events are merged into one list.
     """
     client = GoogleCalendarClient(
         credentials=credentials,
         calendar_id=calendar_id,
         logger=logger,
     )
-    return client.get_events(range_type=range_type)
+    return client.get_events(range_type=range_type, raise_errors=raise_errors)
@@ -1,8 +1,15 @@
 import argparse
+import json
 import logging
+import os
+import socket
+from collections import defaultdict
+from typing import Callable, List
 
+from calendar_watch import CalendarWatcher, NotificationCoalescer
 from event import EventFormatter
-from google_calendar_api import get_events
+from google_calendar_api import GoogleCalendarClient, get_events
+from route_worker import Route, RouteWorker, SQLiteLeaseStore
 from telegram_client import send_telegram_message
 
 logging.basicConfig(
@@ -12,31 +19,168 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main(range_type: str):
-    try:
-        events = get_events(range_type=range_type)
+def publish(
+    range_type: str,
+    calendar_id: str = None,
+    chat_id: str = None,
+    before_send: Callable[[], None] = None,
+):
+    """
+    Fetches the events of a calendar and sends them to a chat.
+    Errors, including failures to fetch the events, are raised to the
+    caller. before_send is called right before sending and may raise to
+    abort it.
+    """
+    events = get_events(
+        calendar_id=calendar_id, range_type=range_type, raise_errors=True
+    )
 
-        if not events:
-            logger.warning("No events found.")
-            return
+    if not events:
+        logger.warning("No events found.")
+        return
 
-        messages = []
-        for event in events:
-            try:
-                formatted_event = EventFormatter.format(event)
-                messages.append(formatted_event)
-            except Exception as format_error:
-                logger.error(f"Error formatting event {event}: {format_error}")
-                continue  # continue processing other events
+    messages = []
+    for event in events:
+        try:
+            formatted_event = EventFormatter.format(event)
+            messages.append(formatted_event)
+        except Exception as format_error:
+            logger.error(f"Error formatting event {event}: {format_error}")
+            continue  # continue processing other events
 
-        events_message = "\n\n".join(messages)
+    events_message = "\n\n".join(messages)
 
-        send_telegram_message(events_message, logger=logger)
+    if before_send:
+        before_send()
+    send_telegram_message(events_message, chat_id=chat_id, logger=logger)
 
+
+def main(range_type: str):
+    try:
+        publish(range_type)
     except Exception as e:
         logger.error(f"Error: {e}")
 
 
+def load_routes(routes_file: str) -> List[Route]:
+    with open(routes_file) as f:
+        return [
+            Route(calendar_id=route["calendar_id"], chat_id=route["chat_id"])
+            for route in json.load(f)
+        ]
+
+
+def run_worker(
+    range_type: str,
+    routes_file: str,
+    lease_db: str,
+    worker_id: str = None,
+    lease_ttl: float = 300,
+    poll_interval: float = 10,
+):
+    """
+    Publishes the routes listed in routes_file, coordinating with other
+    workers through the lease database.
+    """
+    routes = load_routes(routes_file)
+
+    worker = RouteWorker(
+        routes=routes,
+        store=SQLiteLeaseStore(lease_db),
+        publish=lambda route, renew_lease: publish(
+            range_type,
+            calendar_id=route.calendar_id,
+            chat_id=route.chat_id,
+            before_send=renew_lease,
+        ),
+        worker_id=worker_id or f"{socket.gethostname()}-{os.getpid()}",
+        period=(
+            f"{range_type}:"
+            f"{GoogleCalendarClient.determine_date_range(range_type)[0]}"
+        ),
+        lease_ttl=lease_ttl,
+        poll_interval=poll_interval,
+        logger=logger,
+    )
+    # Keep polling long enough for the lease of a dead worker to expire.
+    pending = worker.run(max_passes=int(lease_ttl // poll_interval) + 2)
+    if pending:
+        logger.warning(
+            "Routes not published: "
+            + ", ".join(route.key for route in pending)
+        )
+
+
+def run_watch(
+    range_type: str,
+    address: str,
+    port: int,
+    routes_file: str = None,
+    coalesce_delay: float = 5,
+):
+    """
+    Republishes a calendar as soon as Google Calendar notifies a change.
+    Without a routes_file, the calendar and chat come from the environment.
+    Routes merging several calendars are republished when any of them
+    changes, once per burst of changes.
+    """
+    if routes_file:
+        routes = load_routes(routes_file)
+    else:
+        client = GoogleCalendarClient(logger=logger)
+        routes = [
+            Route(calendar_id=",".join(client.calendar_ids), chat_id=None)
+        ]
+
+    # Each watched calendar maps to the routes that include it.
+    watched_routes = defaultdict(list)
+    for route in routes:
+        for calendar_id in GoogleCalendarClient.split_calendar_ids(
+            route.calendar_id
+        ):
+            watched_routes[calendar_id].append(route)
+
+    routes_by_key = {route.key: route for route in routes}
+
+    def publish_route(route_key: str):
+        route = routes_by_key[route_key]
+        try:
+            publish(
+                range_type,
+                calendar_id=route.calendar_id,
+                chat_id=route.chat_id,
+            )
+        except Exception as e:
+            logger.error(f"Error: {e}")
+
+    # Coalesce on the route too, so that changes to several calendars of
+    # a merged route publish it once, and never concurrently.
+    route_coalescer = NotificationCoalescer(
+        publish_route, delay=coalesce_delay
+    )
+
+    def on_change(calendar_id: str):
+        for route in watched_routes[calendar_id]:
+            route_coalescer.notify(route.key)
+
+    watcher = CalendarWatcher(
+        clients=[
+            GoogleCalendarClient(calendar_id=calendar_id, logger=logger)
+            for calendar_id in watched_routes
+        ],
+        address=address,
+        on_change=on_change,
+        port=port,
+        range_type=range_type,
+        coalesce_delay=coalesce_delay,
+        logger=logger,
+    )
+    try:
+        watcher.run()
+    finally:
+        route_coalescer.cancel()
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Fetch Google Calendar events and send them via Telegram."
@@ -51,6 +195,61 @@ if __name__ == "__main__":
             " Defaults to month."
         ),
     )
+    parser.add_argument(
+        "--routes-file",
+        type=str,
+        help=(
+            "JSON file listing calendar_id/chat_id routes. Runs in worker"
+            " mode, sharing the routes with other workers."
+        ),
+    )
+    parser.add_argument(
+        "--lease-db",
+        type=str,
+        default="leases.db",
+        help="SQLite file used to coordinate workers. Defaults to leases.db.",
+    )
+    parser.add_argument(
+        "--worker-id",
+        type=str,
+        help="Unique worker name. Defaults to <hostname>-<pid>.",
+    )
+    parser.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=300,
+        help="Seconds a claimed route is held. Defaults to 300.",
+    )
+    parser.add_argument(
+        "--watch-address",
+        type=str,
+        help=(
+            "Public HTTPS URL of the webhook receiver. Republishes on"
+            " calendar changes instead of running once."
+        ),
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="Port of the webhook receiver. Defaults to 8080.",
+    )
     args = parser.parse_args()
 
-    main(range_type=args.range_type)
+    if args.watch_address:
+        run_watch(
+            range_type=args.range_type,
+            address=args.watch_address,
+            port=args.port,
+            routes_file=args.routes_file,
+        )
+    elif args.routes_file:
+        run_worker(
+            range_type=args.range_type,
+            routes_file=args.routes_file,
+            lease_db=args.lease_db,
+            worker_id=args.worker_id,
+            lease_ttl=args.lease_ttl,
+        )
+    else:
+        main(range_type=args.range_type)
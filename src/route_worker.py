@@ -0,0 +1,270 @@
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Tuple
+
+
+@dataclass(frozen=True)
+class Route:
+    """Dataclass to represent a calendar to chat publishing route"""
+
+    calendar_id: str
+    chat_id: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.calendar_id}:{self.chat_id}"
+
+
+class LeaseStore(ABC):
+    """Shared store used by workers to claim routes and record completion."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+
+    @abstractmethod
+    def claim(self, route_key: str, worker_id: str, ttl: float) -> bool:
+        """
+        Claims or renews the lease on a route.
+        Returns True if the worker now holds the lease.
+        """
+
+    @abstractmethod
+    def release(self, route_key: str, worker_id: str) -> None:
+        """Releases the lease on a route if it is held by the worker."""
+
+    @abstractmethod
+    def complete(self, route_key: str, period: str, worker_id: str) -> bool:
+        """
+        Records the route as published for the period and releases the
+        lease. Returns False, recording nothing, if the worker no longer
+        holds the lease.
+        """
+
+    @abstractmethod
+    def is_completed(self, route_key: str, period: str) -> bool:
+        """Returns True if the route was already published for the period."""
+
+
+class InMemoryLeaseStore(LeaseStore):
+    """Local stand-in for a shared lease store, for single-host use."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        super().__init__(clock)
+        self._lock = threading.Lock()
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._completed: Dict[Tuple[str, str], str] = {}
+
+    def claim(self, route_key: str, worker_id: str, ttl: float) -> bool:
+        now = self.clock()
+        with self._lock:
+            owner, expires_at = self._leases.get(route_key, (None, 0))
+            if owner not in (None, worker_id) and expires_at > now:
+                return False
+            self._leases[route_key] = (worker_id, now + ttl)
+            return True
+
+    def release(self, route_key: str, worker_id: str) -> None:
+        with self._lock:
+            if self._leases.get(route_key, (None, 0))[0] == worker_id:
+                del self._leases[route_key]
+
+    def complete(self, route_key: str, period: str, worker_id: str) -> bool:
+        with self._lock:
+            if self._leases.get(route_key, (None, 0))[0] != worker_id:
+                return False
+            self._completed.setdefault((route_key, period), worker_id)
+            del self._leases[route_key]
+            return True
+
+    def is_completed(self, route_key: str, period: str) -> bool:
+        with self._lock:
+            return (route_key, period) in self._completed
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """Lease store backed by a SQLite file, e.g. on shared storage."""
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        super().__init__(clock)
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " route TEXT PRIMARY KEY,"
+                " owner TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " route TEXT NOT NULL,"
+                " period TEXT NOT NULL,"
+                " owner TEXT NOT NULL,"
+                " completed_at REAL NOT NULL,"
+                " PRIMARY KEY (route, period))"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Opens a connection running a single transaction, then closes it."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def claim(self, route_key: str, worker_id: str, ttl: float) -> bool:
+        now = self.clock()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO leases (route, owner, expires_at)"
+                " VALUES (?, ?, ?)"
+                " ON CONFLICT (route) DO UPDATE SET"
+                " owner = excluded.owner, expires_at = excluded.expires_at"
+                " WHERE leases.owner = excluded.owner"
+                " OR leases.expires_at <= ?",
+                (route_key, worker_id, now + ttl, now),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, route_key: str, worker_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM leases WHERE route = ? AND owner = ?",
+                (route_key, worker_id),
+            )
+
+    def complete(self, route_key: str, period: str, worker_id: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM leases WHERE route = ? AND owner = ?",
+                (route_key, worker_id),
+            )
+            if cursor.rowcount != 1:
+                return False
+            conn.execute(
+                "INSERT OR IGNORE INTO completions"
+                " (route, period, owner, completed_at) VALUES (?, ?, ?, ?)",
+                (route_key, period, worker_id, self.clock()),
+            )
+            return True
+
+    def is_completed(self, route_key: str, period: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM completions WHERE route = ? AND period = ?",
+                (route_key, period),
+            ).fetchone()
+        return row is not None
+
+
+class LeaseLostError(Exception):
+    """Raised when a worker no longer holds the lease on its route."""
+
+
+class RouteWorker:
+    """
+    Publishes routes claimed through a shared lease store.
+
+    Several workers can share the same routes and store. Each route is
+    published at most once per period, and routes held by a worker that
+    died are picked up by the others once its lease expires.
+
+    `publish` is called with the route and a `renew_lease` callback, to be
+    called right before sending. It renews the lease, or raises
+    LeaseLostError if another worker has taken the route over meanwhile.
+    """
+
+    def __init__(
+        self,
+        routes: List[Route],
+        store: LeaseStore,
+        publish: Callable[[Route, Callable[[], None]], None],
+        worker_id: str,
+        period: str,
+        lease_ttl: float = 300,
+        poll_interval: float = 10,
+        sleep: Callable[[float], None] = time.sleep,
+        logger=None,
+    ):
+        if lease_ttl <= 0:
+            raise ValueError("lease_ttl must be greater than zero")
+
+        # Start each worker at a different offset so that concurrent
+        # workers spread out over the routes instead of racing for the
+        # first one.
+        offset = zlib.crc32(worker_id.encode()) % len(routes) if routes else 0
+        self.routes = routes[offset:] + routes[:offset]
+        self.store = store
+        self.publish = publish
+        self.worker_id = worker_id
+        self.period = period
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.sleep = sleep
+        self.logger = logger or logging.getLogger(__name__)
+
+    def run_once(self) -> List[Route]:
+        """
+        Makes a single pass over the routes, publishing each one that is
+        neither completed nor leased by another worker.
+        Returns the routes that are still pending.
+        """
+        pending = []
+        for route in self.routes:
+            if self.store.is_completed(route.key, self.period):
+                continue
+            if not self.store.claim(route.key, self.worker_id, self.lease_ttl):
+                pending.append(route)
+                continue
+            # Another worker may have completed the route between the
+            # check above and claiming the lease.
+            if self.store.is_completed(route.key, self.period):
+                self.store.release(route.key, self.worker_id)
+                continue
+
+            def renew_lease(route=route):
+                if not self.store.claim(
+                    route.key, self.worker_id, self.lease_ttl
+                ):
+                    raise LeaseLostError(f"Lease on {route.key} was lost.")
+
+            try:
+                self.publish(route, renew_lease)
+            except Exception as e:
+                self.logger.error(f"Error publishing route {route.key}: {e}")
+                self.store.release(route.key, self.worker_id)
+                pending.append(route)
+                continue
+
+            if not self.store.complete(route.key, self.period, self.worker_id):
+                self.logger.warning(
+                    f"Published route {route.key}, but its lease was lost"
+                    " before it could be recorded."
+                )
+                continue
+            self.logger.info(f"Published route {route.key}")
+        return pending
+
+    def run(self, max_passes: int = None) -> List[Route]:
+        """
+        Repeats passes until every route is completed for the period, or
+        until max_passes is reached. Returns the routes still pending.
+        """
+        passes = 0
+        while True:
+            pending = self.run_once()
+            passes += 1
+            if not pending or (max_passes and passes >= max_passes):
+                return pending
+            self.logger.info(
+                f"{len(pending)} route(s) pending, retrying in"
+                f" {self.poll_interval}s"
+            )
+            self.sleep(self.poll_interval)
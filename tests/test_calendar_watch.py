@@ -0,0 +1,272 @@
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from src.calendar_watch import (
+    CalendarWatcher,
+    GoogleCalendarClient,
+    NotificationCoalescer,
+    WebhookReceiver,
+)
+
+
+class LocalNotifier:
+    """Stand-in for Google sending push notifications to the receiver."""
+
+    def __init__(self, port: int):
+        self.url = f"http://127.0.0.1:{port}/"
+
+    def send(self, channel_id, token, state="exists") -> int:
+        request = urllib.request.Request(
+            self.url,
+            method="POST",
+            headers={
+                "X-Goog-Channel-ID": channel_id,
+                "X-Goog-Channel-Token": token,
+                "X-Goog-Resource-State": state,
+            },
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+class TestNotificationCoalescer(unittest.TestCase):
+    def test_burst_is_coalesced(self):
+        fired = threading.Event()
+        callback = MagicMock(side_effect=lambda key: fired.set())
+        coalescer = NotificationCoalescer(callback, delay=0.1)
+
+        for _ in range(5):
+            coalescer.notify("calendar")
+
+        self.assertTrue(fired.wait(2))
+        callback.assert_called_once_with("calendar")
+
+    def test_slow_callback_is_not_run_concurrently(self):
+        started = threading.Event()
+        release = threading.Event()
+        finished = threading.Semaphore(0)
+        active = []
+        overlaps = []
+
+        def callback(key):
+            if active:
+                overlaps.append(key)
+            active.append(key)
+            started.set()
+            release.wait(2)
+            active.remove(key)
+            finished.release()
+
+        coalescer = NotificationCoalescer(callback, delay=0.05)
+
+        coalescer.notify("calendar")
+        self.assertTrue(started.wait(2))
+        for _ in range(3):
+            coalescer.notify("calendar")
+        time.sleep(0.2)
+        release.set()
+
+        self.assertTrue(finished.acquire(timeout=2))
+        self.assertTrue(finished.acquire(timeout=2))
+        self.assertFalse(finished.acquire(timeout=0.2))
+        self.assertEqual(overlaps, [])
+
+    def test_cancel(self):
+        callback = MagicMock()
+        coalescer = NotificationCoalescer(callback, delay=0.1)
+
+        coalescer.notify("calendar")
+        coalescer.cancel()
+
+        callback.assert_not_called()
+
+
+class TestWebhookReceiver(unittest.TestCase):
+    def setUp(self):
+        self.on_notification = MagicMock()
+        self.receiver = WebhookReceiver(
+            resolve=lambda channel_id, token: (
+                "calendar" if (channel_id, token) == ("id", "token") else None
+            ),
+            on_notification=self.on_notification,
+            host="127.0.0.1",
+            port=0,
+        )
+        self.receiver.start()
+        self.addCleanup(self.receiver.stop)
+        self.notifier = LocalNotifier(self.receiver.port)
+
+    def test_notification(self):
+        self.assertEqual(self.notifier.send("id", "token"), 200)
+        self.on_notification.assert_called_once_with("calendar")
+
+    def test_sync_notification_is_ignored(self):
+        self.assertEqual(self.notifier.send("id", "token", state="sync"), 200)
+        self.on_notification.assert_not_called()
+
+    def test_unknown_channel(self):
+        self.assertEqual(self.notifier.send("id", "wrong-token"), 404)
+        self.on_notification.assert_not_called()
+
+
+class TestWebhookReceiverNotStarted(unittest.TestCase):
+    def test_stop_without_start(self):
+        receiver = WebhookReceiver(
+            resolve=MagicMock(),
+            on_notification=MagicMock(),
+            host="127.0.0.1",
+            port=0,
+        )
+        stopped = threading.Event()
+
+        threading.Thread(
+            target=lambda: (receiver.stop(), stopped.set()), daemon=True
+        ).start()
+
+        self.assertTrue(stopped.wait(2))
+
+
+def make_item(event_id, days=0):
+    start = datetime.utcnow() + timedelta(days=days)
+    return {
+        "id": event_id,
+        "status": "confirmed",
+        "start": {"dateTime": start.isoformat() + "Z"},
+        "end": {"dateTime": (start + timedelta(hours=1)).isoformat() + "Z"},
+    }
+
+
+class TestCalendarWatcher(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.client = MagicMock(calendar_id="calendar")
+        self.client.watch_events.side_effect = lambda address, token: {
+            "id": f"channel-{self.client.watch_events.call_count}",
+            "resourceId": "resource",
+            "expiration": str(int((self.now + 7200) * 1000)),
+        }
+        self.changed = threading.Event()
+        self.on_change = MagicMock(side_effect=lambda _: self.changed.set())
+        self.watcher = CalendarWatcher(
+            clients=[self.client],
+            address="https://example.com/notify",
+            on_change=self.on_change,
+            host="127.0.0.1",
+            port=0,
+            coalesce_delay=0.1,
+            clock=lambda: self.now,
+        )
+
+    def start(self):
+        self.watcher.start()
+        self.addCleanup(self.watcher.stop)
+        return LocalNotifier(self.watcher.receiver.port)
+
+    def test_start_syncs_and_watches(self):
+        self.start()
+
+        self.client.get_changed_events.assert_called_once_with("month")
+        self.client.watch_events.assert_called_once_with(
+            "https://example.com/notify", token=self.watcher.token
+        )
+
+    def test_notification_triggers_change(self):
+        notifier = self.start()
+        self.client.get_changed_events.return_value = [make_item("1")]
+
+        for _ in range(3):
+            notifier.send("channel-1", self.watcher.token)
+
+        self.assertTrue(self.changed.wait(2))
+        self.on_change.assert_called_once_with("calendar")
+
+    def test_change_outside_range_is_ignored(self):
+        notifier = self.start()
+        self.client.get_changed_events.return_value = [
+            make_item("1", days=400),
+            make_item("2", days=-400),
+        ]
+        self.client.get_changed_events.reset_mock()
+
+        notifier.send("channel-1", self.watcher.token)
+
+        self.assertFalse(self.changed.wait(0.5))
+        self.client.get_changed_events.assert_called_once_with("month")
+
+    def test_deleted_event_in_range_triggers_change(self):
+        self.client.get_changed_events.return_value = [make_item("1")]
+        notifier = self.start()
+        self.client.get_changed_events.return_value = [
+            {"id": "1", "status": "cancelled"}
+        ]
+
+        notifier.send("channel-1", self.watcher.token)
+
+        self.assertTrue(self.changed.wait(2))
+        self.on_change.assert_called_once_with("calendar")
+
+    def test_range_moving_resyncs_events(self):
+        september = ("2023-09-01T00:00:00Z", "2023-09-30T23:59:59.999999Z")
+        october = ("2023-10-01T00:00:00Z", "2023-10-31T23:59:59.999999Z")
+        untouched = {
+            "id": "1",
+            "status": "confirmed",
+            "start": {"dateTime": "2023-10-10T10:00:00Z"},
+            "end": {"dateTime": "2023-10-10T11:00:00Z"},
+        }
+        sync_tokens = []
+
+        def get_changed_events(range_type):
+            sync_tokens.append(self.client.sync_token)
+            self.client.sync_token = "token"
+            return responses.pop(0)
+
+        responses = [[], [untouched], [{"id": "1", "status": "cancelled"}]]
+        self.client.get_changed_events.side_effect = get_changed_events
+
+        with patch.object(
+            GoogleCalendarClient, "determine_date_range"
+        ) as mock_range:
+            mock_range.return_value = september
+            self.watcher.start()
+            self.addCleanup(self.watcher.stop)
+
+            mock_range.return_value = october
+            self.watcher._handle_change("calendar")
+            self.watcher._handle_change("calendar")
+
+        self.assertEqual(sync_tokens, [None, None, "token"])
+        self.assertEqual(self.on_change.call_count, 2)
+
+    def test_notification_without_changes(self):
+        notifier = self.start()
+        self.client.get_changed_events.return_value = []
+        self.client.get_changed_events.reset_mock()
+
+        notifier.send("channel-1", self.watcher.token)
+
+        self.assertFalse(self.changed.wait(0.5))
+        self.client.get_changed_events.assert_called_once()
+
+    def test_renew_before_expiry(self):
+        notifier = self.start()
+
+        self.now += 3000
+        self.watcher.renew()
+        self.client.watch_events.assert_called_once()
+
+        self.now += 1000
+        self.watcher.renew()
+        self.assertEqual(self.client.watch_events.call_count, 2)
+        self.client.stop_watch.assert_called_once()
+        self.assertEqual(self.watcher.channels["calendar"]["id"], "channel-2")
+        self.assertEqual(notifier.send("channel-1", self.watcher.token), 404)
+        self.assertEqual(notifier.send("channel-2", self.watcher.token), 200)
@@ -0,0 +1,95 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from src.event import Event
+from src.event_merge import merge_events
+
+
+def make_event(title, hour, ical_uid=None, location="A Place"):
+    return Event(
+        title=title,
+        location=location,
+        description="Description",
+        date="Sep 19th",
+        start_time=f"{hour}AM",
+        end_time=f"{hour + 1}AM",
+        start=datetime(2023, 9, 19, hour),
+        ical_uid=ical_uid,
+    )
+
+
+class TestMergeEvents(unittest.TestCase):
+    def test_merges_in_start_order(self):
+        first = [make_event("A", 1), make_event("C", 3), make_event("E", 5)]
+        second = [make_event("B", 2), make_event("D", 4)]
+
+        merged = list(merge_events([iter(first), iter(second)]))
+
+        self.assertEqual([e.title for e in merged], ["A", "B", "C", "D", "E"])
+
+    def test_empty_streams(self):
+        self.assertEqual(list(merge_events([])), [])
+        self.assertEqual(list(merge_events([[], []])), [])
+
+    def test_is_lazy(self):
+        def stream():
+            yield make_event("A", 1)
+            raise AssertionError("Stream read too far")
+
+        merged = merge_events([stream(), [make_event("B", 2)]])
+
+        self.assertEqual(next(merged).title, "A")
+
+    def test_deduplicates_by_ical_uid(self):
+        first = [make_event("Meetup", 1, ical_uid="uid-1")]
+        second = [
+            make_event("Meetup (copy)", 1, ical_uid="uid-1"),
+            make_event("Other", 2, ical_uid="uid-2"),
+        ]
+
+        merged = list(merge_events([first, second]))
+
+        self.assertEqual([e.title for e in merged], ["Meetup", "Other"])
+
+    def test_recurring_instances_are_kept(self):
+        first = [
+            make_event("Weekly", 1, ical_uid="uid-1"),
+            make_event("Weekly", 2, ical_uid="uid-1"),
+        ]
+
+        merged = list(merge_events([first, first]))
+
+        self.assertEqual(len(merged), 2)
+
+    def test_deduplicates_by_content(self):
+        first = [make_event("Meetup", 1, ical_uid="uid-1")]
+        second = [
+            make_event("Meetup", 1, ical_uid="uid-2"),
+            make_event("Meetup", 1, location="Elsewhere"),
+        ]
+
+        merged = list(merge_events([first, second]))
+
+        self.assertEqual(
+            [e.location for e in merged], ["A Place", "Elsewhere"]
+        )
+
+    def test_mixes_naive_and_aware_starts(self):
+        aware = make_event("Aware", 2)
+        aware.start = datetime(
+            2023, 9, 19, 3, tzinfo=timezone(timedelta(hours=1))
+        )
+
+        merged = list(merge_events([[aware], [make_event("Naive", 1)]]))
+
+        self.assertEqual([e.title for e in merged], ["Naive", "Aware"])
+
+    def test_missing_start(self):
+        event = make_event("A", 1)
+        event.start = None
+
+        with self.assertRaises(ValueError) as context:
+            list(merge_events([[event]]))
+        self.assertEqual(
+            str(context.exception), "Event A has no start to sort by."
+        )
@@ -2,6 +2,8 @@ import unittest
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
+from googleapiclient.errors import HttpError
+
 from src.google_calendar_api import Event, GoogleCalendarClient
 
 
@@ -113,6 +115,127 @@ class TestGoogleCalendarClient(unittest.TestCase):
         ]
         self.assertEqual(events, expected_events)
 
+    def test_get_events_error(self):
+        self.mock_service.events().list().execute.side_effect = Exception(
+            "Calendar is down"
+        )
+
+        self.assertEqual(self.gc.get_events(), [])
+        with self.assertRaises(Exception) as context:
+            self.gc.get_events(raise_errors=True)
+        self.assertEqual(str(context.exception), "Calendar is down")
+
+    def test_iter_events_follows_pages(self):
+        self.mock_service.events().list().execute.side_effect = [
+            {
+                "items": [
+                    {
+                        "summary": "Test Event 1",
+                        "location": "A Place",
+                        "description": "Description 1",
+                        "start": {"dateTime": "2023-09-19T10:00:00+01:00"},
+                        "end": {"dateTime": "2023-09-19T11:00:00+01:00"},
+                        "iCalUID": "uid-1",
+                    }
+                ],
+                "nextPageToken": "page-2",
+            },
+            {"items": []},
+        ]
+
+        events = list(self.gc.iter_events(calendar_id="other-id"))
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].ical_uid, "uid-1")
+        self.assertEqual(
+            events[0].start,
+            datetime.fromisoformat("2023-09-19T10:00:00+01:00"),
+        )
+        self.assertEqual(
+            self.mock_service.events().list.call_args.kwargs["pageToken"],
+            "page-2",
+        )
+        self.assertEqual(
+            self.mock_service.events().list.call_args.kwargs["calendarId"],
+            "other-id",
+        )
+
+    def test_iter_merged_events(self):
+        def item(summary, start, uid):
+            return {
+                "summary": summary,
+                "location": "A Place",
+                "description": "Description",
+                "start": {"dateTime": start},
+                "end": {"dateTime": start},
+                "iCalUID": uid,
+            }
+
+        self.mock_service.events().list().execute.side_effect = [
+            {
+                "items": [
+                    item("Shared", "2023-09-19T10:00:00Z", "uid-1"),
+                    item("Late", "2023-09-21T10:00:00Z", "uid-3"),
+                ]
+            },
+            {
+                "items": [
+                    item("Shared", "2023-09-19T10:00:00Z", "uid-1"),
+                    item("Middle", "2023-09-20T10:00:00Z", "uid-2"),
+                ]
+            },
+        ]
+
+        self.gc.calendar_ids = ["first-id", "second-id"]
+        events = self.gc.iter_merged_events()
+
+        self.assertEqual(
+            [event.title for event in events], ["Shared", "Middle", "Late"]
+        )
+
+    def test_iter_merged_events_with_all_day_events(self):
+        def item(summary, start, uid):
+            return {
+                "summary": summary,
+                "location": "A Place",
+                "description": "Description",
+                "start": start,
+                "end": start,
+                "iCalUID": uid,
+            }
+
+        all_day = item("All Day", {"date": "2023-09-20"}, "uid-3")
+        self.mock_service.events().list().execute.side_effect = [
+            {
+                "timeZone": "America/New_York",
+                "items": [
+                    item(
+                        "Late Evening",
+                        {"dateTime": "2023-09-19T22:00:00-04:00"},
+                        "uid-1",
+                    ),
+                    all_day,
+                ],
+            },
+            {
+                "timeZone": "America/New_York",
+                "items": [
+                    item(
+                        "Night", {"dateTime": "2023-09-20T03:00:00Z"}, "uid-2"
+                    ),
+                    all_day,
+                ],
+            },
+        ]
+        self.gc.calendar_ids = ["first-id", "second-id"]
+
+        events = self.gc.iter_merged_events()
+
+        self.assertEqual(
+            [event.title for event in events],
+            ["Late Evening", "Night", "All Day"],
+        )
+
     def test_get_date(self):
         test_data = [
             {
@@ -137,6 +260,108 @@ class TestGoogleCalendarClient(unittest.TestCase):
                 result = self.gc.ordinal(data["input"])
                 self.assertEqual(result, data["expected"])
 
+    def test_get_changed_events_full_then_incremental_sync(self):
+        self.mock_service.events().list().execute.side_effect = [
+            {"items": [{"id": "1"}], "nextPageToken": "page-2"},
+            {"items": [{"id": "2"}], "nextSyncToken": "sync-1"},
+            {"items": [{"id": "1"}], "nextSyncToken": "sync-2"},
+        ]
+
+        self.assertEqual(
+            self.gc.get_changed_events(), [{"id": "1"}, {"id": "2"}]
+        )
+        self.assertEqual(self.gc.sync_token, "sync-1")
+        self.mock_service.events().list.assert_called_with(
+            calendarId="some-id", pageToken="page-2", singleEvents=True
+        )
+
+        self.assertEqual(self.gc.get_changed_events(), [{"id": "1"}])
+        self.assertEqual(self.gc.sync_token, "sync-2")
+        self.mock_service.events().list.assert_called_with(
+            calendarId="some-id", singleEvents=True, syncToken="sync-1"
+        )
+
+    @patch.object(
+        GoogleCalendarClient,
+        "determine_date_range",
+        return_value=("2023-09-01T00:00:00Z", "2023-09-30T23:59:59Z"),
+    )
+    def test_get_changed_events_full_sync_limited_to_range(self, _):
+        self.mock_service.events().list().execute.side_effect = [
+            {"items": [], "nextSyncToken": "sync-1"},
+            {"items": [], "nextSyncToken": "sync-2"},
+        ]
+
+        self.gc.get_changed_events(range_type="month")
+        self.mock_service.events().list.assert_called_with(
+            calendarId="some-id",
+            singleEvents=True,
+            timeMin="2023-09-01T00:00:00Z",
+            timeMax="2023-09-30T23:59:59Z",
+        )
+
+        self.gc.get_changed_events(range_type="month")
+        self.mock_service.events().list.assert_called_with(
+            calendarId="some-id", singleEvents=True, syncToken="sync-1"
+        )
+
+    def test_get_changed_events_expired_sync_token(self):
+        self.gc.sync_token = "expired"
+        self.mock_service.events().list().execute.side_effect = [
+            HttpError(MagicMock(status=410), b"Gone"),
+            {"items": [{"id": "1"}], "nextSyncToken": "sync-1"},
+        ]
+
+        self.assertEqual(self.gc.get_changed_events(), [{"id": "1"}])
+        self.assertEqual(self.gc.sync_token, "sync-1")
+
+    def test_watch_events(self):
+        self.mock_service.events().watch().execute.return_value = {
+            "id": "channel-id",
+            "resourceId": "resource-id",
+            "expiration": "1700000000000",
+        }
+
+        channel = self.gc.watch_events("https://example.com", token="secret")
+
+        self.assertEqual(channel["id"], "channel-id")
+        body = self.mock_service.events().watch.call_args.kwargs["body"]
+        self.assertEqual(body["address"], "https://example.com")
+        self.assertEqual(body["token"], "secret")
+        self.assertEqual(body["type"], "web_hook")
+
+    def test_stop_watch(self):
+        self.gc.stop_watch({"id": "channel-id", "resourceId": "resource-id"})
+
+        self.mock_service.channels().stop.assert_called_with(
+            body={"id": "channel-id", "resourceId": "resource-id"}
+        )
+
+    @patch.dict("os.environ", {"GOOGLE_CALENDAR_ID": "first-id, second-id"})
+    @patch("src.google_calendar_api.Credentials.from_service_account_info")
+    def test_several_calendar_ids(self, _):
+        gc = GoogleCalendarClient()
+        gc.service = self.mock_service
+        self.mock_google_calendar_response()
+
+        self.assertEqual(gc.calendar_ids, ["first-id", "second-id"])
+        with self.assertRaises(ValueError) as context:
+            gc.watch_events("https://example.com")
+        self.assertEqual(
+            str(context.exception),
+            "A single calendar ID is required, got 2.",
+        )
+
+        self.assertEqual(gc.get_events(), [])
+        self.assertEqual(
+            [
+                call.kwargs["calendarId"]
+                for call in self.mock_service.events().list.call_args_list
+                if call.kwargs
+            ],
+            ["first-id", "second-id"],
+        )
+
     @patch.dict(
         "os.environ", {"GOOGLE_CALENDAR_ID": "", "GOOGLE_CREDENTIALS": ""}
     )
@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.google_calendar_api import GoogleCalendarClient
+from src.main import publish, run_watch, run_worker
+from src.route_worker import SQLiteLeaseStore
+
+
+class TestRunWorker(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.routes_file = os.path.join(directory.name, "routes.json")
+        self.lease_db = os.path.join(directory.name, "leases.db")
+        with open(self.routes_file, "w") as f:
+            json.dump([{"calendar_id": "calendar", "chat_id": "chat"}], f)
+
+    def run_worker(self):
+        run_worker(
+            range_type="month",
+            routes_file=self.routes_file,
+            lease_db=self.lease_db,
+            worker_id="worker-a",
+            lease_ttl=0.01,
+            poll_interval=0.01,
+        )
+
+    def is_completed(self):
+        period = f"month:{GoogleCalendarClient.determine_date_range()[0]}"
+        return SQLiteLeaseStore(self.lease_db).is_completed(
+            "calendar:chat", period
+        )
+
+    @patch("src.main.send_telegram_message")
+    @patch("src.main.get_events")
+    def test_failed_fetch_leaves_route_pending(self, mock_get_events, _):
+        mock_get_events.side_effect = Exception("Calendar is down")
+
+        self.run_worker()
+
+        self.assertEqual(mock_get_events.call_count, 3)
+        self.assertTrue(mock_get_events.call_args.kwargs["raise_errors"])
+        self.assertFalse(self.is_completed())
+        self.assertTrue(
+            SQLiteLeaseStore(self.lease_db).claim("calendar:chat", "b", 60)
+        )
+
+    @patch("src.main.send_telegram_message")
+    @patch("src.main.get_events")
+    def test_published_route_is_completed(self, mock_get_events, mock_send):
+        mock_get_events.return_value = []
+
+        self.run_worker()
+
+        mock_get_events.assert_called_once()
+        self.assertTrue(self.is_completed())
+
+
+class TestPublish(unittest.TestCase):
+    @patch("src.main.send_telegram_message")
+    @patch("src.main.EventFormatter.format", return_value="message")
+    @patch("src.main.get_events", return_value=["event"])
+    def test_before_send_aborts_sending(self, _, __, mock_send):
+        before_send = MagicMock(side_effect=Exception("Lease lost"))
+
+        with self.assertRaises(Exception) as context:
+            publish("month", before_send=before_send)
+
+        self.assertEqual(str(context.exception), "Lease lost")
+        before_send.assert_called_once()
+        mock_send.assert_not_called()
+
+
+class TestRunWatch(unittest.TestCase):
+    @patch.dict("os.environ", {"GOOGLE_CALENDAR_ID": "first-id,second-id"})
+    @patch("google_calendar_api.build")
+    @patch("google_calendar_api.Credentials.from_service_account_info")
+    @patch("src.main.publish")
+    @patch("src.main.CalendarWatcher")
+    def test_watches_each_calendar(self, mock_watcher, mock_publish, *_):
+        published = threading.Event()
+        mock_publish.side_effect = lambda *args, **kwargs: published.set()
+
+        def run():
+            on_change = mock_watcher.call_args.kwargs["on_change"]
+            on_change("first-id")
+            on_change("second-id")
+            self.assertTrue(published.wait(2))
+            time.sleep(0.2)
+
+        mock_watcher.return_value.run.side_effect = run
+
+        run_watch(
+            range_type="month",
+            address="https://example.com",
+            port=0,
+            coalesce_delay=0.05,
+        )
+
+        self.assertEqual(
+            [
+                client.calendar_id
+                for client in mock_watcher.call_args.kwargs["clients"]
+            ],
+            ["first-id", "second-id"],
+        )
+        mock_publish.assert_called_once_with(
+            "month", calendar_id="first-id,second-id", chat_id=None
+        )
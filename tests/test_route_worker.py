@@ -0,0 +1,219 @@
+import os
+import tempfile
+import unittest
+from abc import ABC, abstractmethod
+from unittest.mock import MagicMock, patch
+
+from src.route_worker import (
+    InMemoryLeaseStore,
+    Route,
+    RouteWorker,
+    SQLiteLeaseStore,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class LeaseStoreTests(ABC):
+    """Tests shared by every lease store."""
+
+    @abstractmethod
+    def make_store(self, clock):
+        """Returns the lease store under test."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = self.make_store(self.clock)
+
+    def test_claim_unleased_route(self):
+        self.assertTrue(self.store.claim("route", "worker-a", 60))
+
+    def test_claim_held_by_other_worker(self):
+        self.store.claim("route", "worker-a", 60)
+        self.assertFalse(self.store.claim("route", "worker-b", 60))
+
+    def test_renew_own_lease(self):
+        self.store.claim("route", "worker-a", 60)
+        self.assertTrue(self.store.claim("route", "worker-a", 60))
+
+    def test_claim_after_lease_expires(self):
+        self.store.claim("route", "worker-a", 60)
+        self.clock.advance(61)
+        self.assertTrue(self.store.claim("route", "worker-b", 60))
+        self.assertFalse(self.store.claim("route", "worker-a", 60))
+
+    def test_release(self):
+        self.store.claim("route", "worker-a", 60)
+        self.store.release("route", "worker-b")
+        self.assertFalse(self.store.claim("route", "worker-b", 60))
+        self.store.release("route", "worker-a")
+        self.assertTrue(self.store.claim("route", "worker-b", 60))
+
+    def test_complete(self):
+        self.store.claim("route", "worker-a", 60)
+        self.store.complete("route", "month:2023-09", "worker-a")
+        self.assertTrue(self.store.is_completed("route", "month:2023-09"))
+        self.assertFalse(self.store.is_completed("route", "month:2023-10"))
+        self.assertTrue(self.store.claim("route", "worker-b", 60))
+
+    def test_complete_requires_lease(self):
+        self.store.claim("route", "worker-a", 60)
+        self.clock.advance(61)
+        self.store.claim("route", "worker-b", 60)
+
+        self.assertFalse(
+            self.store.complete("route", "month:2023-09", "worker-a")
+        )
+        self.assertFalse(self.store.is_completed("route", "month:2023-09"))
+        self.assertTrue(
+            self.store.complete("route", "month:2023-09", "worker-b")
+        )
+
+
+class TestInMemoryLeaseStore(LeaseStoreTests, unittest.TestCase):
+    def make_store(self, clock):
+        return InMemoryLeaseStore(clock=clock)
+
+
+class TestSQLiteLeaseStore(LeaseStoreTests, unittest.TestCase):
+    def make_store(self, clock):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return SQLiteLeaseStore(
+            os.path.join(directory.name, "leases.db"), clock=clock
+        )
+
+    def test_stores_share_file(self):
+        other = SQLiteLeaseStore(self.store.path, clock=self.clock)
+        self.store.claim("route", "worker-a", 60)
+        self.assertFalse(other.claim("route", "worker-b", 60))
+        self.store.complete("route", "month:2023-09", "worker-a")
+        self.assertTrue(other.is_completed("route", "month:2023-09"))
+
+    @patch("src.route_worker.sqlite3.connect")
+    def test_connections_are_closed(self, mock_connect):
+        self.store.release("route", "worker-a")
+        self.store.is_completed("route", "month:2023-09")
+
+        self.assertEqual(mock_connect.return_value.close.call_count, 2)
+
+
+class TestRouteWorker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = InMemoryLeaseStore(clock=self.clock)
+        self.routes = [
+            Route(calendar_id=f"calendar-{i}", chat_id="chat")
+            for i in range(3)
+        ]
+
+    def make_worker(self, worker_id, publish, sleep=None):
+        return RouteWorker(
+            routes=self.routes,
+            store=self.store,
+            publish=publish,
+            worker_id=worker_id,
+            period="month:2023-09",
+            lease_ttl=60,
+            poll_interval=30,
+            sleep=sleep or self.clock.advance,
+        )
+
+    def test_publishes_each_route_once(self):
+        publish = MagicMock()
+        worker_a = self.make_worker("worker-a", publish)
+        worker_b = self.make_worker("worker-b", publish)
+
+        self.assertEqual(worker_a.run_once(), [])
+        self.assertEqual(worker_b.run_once(), [])
+
+        self.assertEqual(publish.call_count, 3)
+        self.assertCountEqual(
+            [call.args[0] for call in publish.call_args_list], self.routes
+        )
+
+    def test_skips_routes_leased_by_other_worker(self):
+        self.store.claim(self.routes[0].key, "worker-b", 60)
+        publish = MagicMock()
+
+        pending = self.make_worker("worker-a", publish).run_once()
+
+        self.assertEqual(pending, [self.routes[0]])
+        self.assertEqual(publish.call_count, 2)
+
+    def test_takes_over_routes_of_dead_worker(self):
+        self.store.claim(self.routes[0].key, "worker-b", 60)
+        publish = MagicMock()
+
+        pending = self.make_worker("worker-a", publish).run()
+
+        self.assertEqual(pending, [])
+        self.assertEqual(publish.call_count, 3)
+        self.assertTrue(
+            self.store.is_completed(self.routes[0].key, "month:2023-09")
+        )
+
+    def test_failed_route_is_released(self):
+        publish = MagicMock(side_effect=Exception("Telegram is down"))
+        worker = self.make_worker("worker-a", publish)
+
+        pending = worker.run(max_passes=2)
+
+        self.assertCountEqual(pending, self.routes)
+        self.assertEqual(publish.call_count, 6)
+        self.assertTrue(self.store.claim(self.routes[0].key, "worker-b", 60))
+
+    def test_lease_expires_during_publish(self):
+        self.routes = self.routes[:1]
+        send = MagicMock()
+
+        def slow_publish(route, renew_lease):
+            self.clock.advance(61)
+            self.store.claim(route.key, "worker-b", 60)
+            renew_lease()
+            send(route)
+
+        with self.assertLogs("src.route_worker", "ERROR") as logs:
+            pending = self.make_worker("worker-a", slow_publish).run_once()
+
+        self.assertIn("was lost", logs.output[0])
+        send.assert_not_called()
+        self.assertEqual(pending, self.routes)
+        self.assertFalse(
+            self.store.is_completed(self.routes[0].key, "month:2023-09")
+        )
+        self.assertFalse(self.store.claim(self.routes[0].key, "worker-a", 60))
+
+    def test_slow_publish_renews_lease(self):
+        def slow_publish(route, renew_lease):
+            self.clock.advance(50)
+            renew_lease()
+            self.clock.advance(50)
+            self.assertFalse(self.store.claim(route.key, "worker-b", 60))
+
+        pending = self.make_worker("worker-a", slow_publish).run_once()
+
+        self.assertEqual(pending, [])
+
+    def test_invalid_lease_ttl(self):
+        with self.assertRaises(ValueError) as context:
+            RouteWorker(
+                routes=self.routes,
+                store=self.store,
+                publish=MagicMock(),
+                worker_id="worker-a",
+                period="month:2023-09",
+                lease_ttl=0,
+            )
+        self.assertEqual(
+            str(context.exception), "lease_ttl must be greater than zero"
+        )